@@ -1,13 +1,27 @@
 # -*- coding: utf-8 -*-
 
+from array import array
+import bisect
+from functools import lru_cache
+from operator import itemgetter
 import configparser
 import logging
 import curses
+import sys
+import textwrap
 import locale as locale_module
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import threading
+import os
+import hashlib
+import pickle
+import time
+from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
 import gzip
-import xml.etree.ElementTree as ET
+import io
 
 try:
     import pytz
@@ -15,102 +29,364 @@ except ImportError:
     print("Error: 'pytz' library is required. Please install it using 'pip install pytz'")
     exit(1)
 
+try:
+    import lxml.etree as ET
+    USING_LXML = True
+except ImportError:
+    # Works without lxml, but parsing large feeds is several times slower
+    import xml.etree.ElementTree as ET
+    USING_LXML = False
+
+
+# Bump whenever the structure of the parsed channel data changes
+CACHE_VERSION = 9
+
+GZIP_MAGIC = b'\x1f\x8b'  # First bytes of every gzip stream
+READ_BUFFER_SIZE = 128 * 1024  # Bytes read from the socket at a time
+STALE_TMP_AGE = 600  # Seconds after which a leftover cache temp file is deleted
+
+_TZ_CACHE = {}  # XMLTV offset string ('+0300') -> tzinfo
+
+
+@lru_cache(maxsize=4096)
+def _parse_xmltv_ts(value):
+    """
+    Parses a fixed-width XMLTV timestamp ('YYYYmmddHHMMSS +HHMM') into an aware datetime.
+    Much faster than datetime.strptime, which dominates parsing of large feeds.
+    Without an offset the time is UTC, as the XMLTV DTD specifies.
+    Memoized: a program's stop is usually the next one's start, so most
+    timestamps repeat, and the programs then share one datetime object.
+    Other spellings of the offset ('+03:00', 'Z', extra spaces) go through strptime.
+    """
+    if len(value) == 14:
+        tz = timezone.utc
+    elif len(value) == 20 and value[14] == ' ' and value[15] in '+-':
+        offset = value[15:]
+        tz = _TZ_CACHE.get(offset)
+        if tz is None:
+            minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+            tz = _TZ_CACHE[offset] = timezone(timedelta(minutes=-minutes if offset[0] == '-' else minutes))
+    else:
+        return datetime.strptime(value, '%Y%m%d%H%M%S %z')
+
+    return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                    int(value[8:10]), int(value[10:12]), int(value[12:14]), tzinfo=tz)
+
+
+@lru_cache(maxsize=4096)
+def _format_start(timestamp, tz, date_fmt, time_fmt):
+    """
+    Formats a program start, given as a POSIX timestamp, into (date, time) labels.
+    Memoized: channels start most programs on the same hours and half-hours.
+    """
+    start_time = datetime.fromtimestamp(timestamp, tz)
+    return start_time.strftime(date_fmt), start_time.strftime(time_fmt)
+
+
+def _iterparse_elements(source, tags):
+    """
+    Yields the elements with the given tags from an XML stream as they are closed.
+    Each element, together with everything parsed before it, is freed once the
+    caller is done with it, so the document tree never grows.
+    """
+    if USING_LXML:
+        context = ET.iterparse(source, events=('end',), tag=tags,
+                               huge_tree=True, collect_ids=False, remove_comments=True)
+        for _, elem in context:
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    else:
+        context = ET.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event == 'end' and elem.tag in tags:
+                yield elem
+                root.clear()  # The wanted elements are direct children of <tv>
+
+
+def _serialize_element(elem):
+    """Returns an element (without its tail) as UTF-8 encoded XML."""
+    if USING_LXML:
+        return ET.tostring(elem, encoding='utf-8', with_tail=False)
+    elem.tail = None
+    return ET.tostring(elem, encoding='utf-8')
+
+
+def _element_attributes(elem):
+    """Collects the attributes and child texts of an element; repeated tags become lists."""
+    attributes = dict(elem.attrib)
+    for child in elem:
+        value = child.text.strip() if child.text else None
+        if not value:
+            continue
+        tag = child.tag
+        existing = attributes.get(tag)
+        if existing is None:
+            attributes[tag] = value
+        elif isinstance(existing, list):
+            existing.append(value)
+        else:
+            attributes[tag] = [existing, value]
+    return attributes
+
+
+class Programme:
+    """
+    A single program of a channel. Slotted: large feeds hold hundreds of
+    thousands of these, and a dict per program costs several times more memory.
+    """
+    __slots__ = ('title', 'start', 'stop', '_raw', '_line', '_wrapped')
+
+    def __init__(self, title, start, stop, raw):
+        self.title = title
+        self.start = start
+        self.stop = stop
+        self._raw = raw  # Serialized <programme> element, decoded only for Screen 4
+        self._line = None  # Screen 3 row, formatted on first display
+        self._wrapped = None  # Screen 4 lines per screen width
+
+    @property
+    def attributes(self):
+        """All XMLTV attributes and child values of the program."""
+        return _element_attributes(ET.fromstring(self._raw))
+
+
+def _cache_dir():
+    """Returns the per-user directory for parsed EPG data (~/.cache/EPGi by default)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'EPGi'
+
 
 class EPGProvider:
     """
     Handles fetching, parsing, and caching EPG data from a single provider URL.
     """
-    def __init__(self, url):
+    def __init__(self, url, session=None, channel_filter=None, cache_ttl=0):
         self.url = url
+        self._session = session if session is not None else requests.Session()
+        # Casefolded name substrings; channels matching none of them are not loaded
+        self._channel_filter = channel_filter or []
+        self._cache_ttl = cache_ttl  # Seconds a disk cache is used without asking the server
         self._channel_data = None  # In-memory cache
+        self._current_cache = None  # (minute, items) from get_current_channel_items()
+        self._lock = threading.Lock()  # Serializes UI access and background prefetch
+        # The filter changes the parsed data, so it is part of the cache key
+        cache_key = '\n'.join([url, *self._channel_filter])
+        url_hash = hashlib.sha1(cache_key.encode('utf-8')).hexdigest()
+        self._cache_path = _cache_dir() / f"{url_hash}.pkl"  # On-disk cache
 
     def get_channels(self):
         """
         Returns a list of channels with their program data.
         Uses cached data if available.
         """
-        if self._channel_data is not None:
-            logging.info(f"Returning cached channel data for {self.url}")
+        with self._lock:
+            if self._channel_data is not None:
+                logging.info(f"Returning cached channel data for {self.url}")
+                return self._channel_data
+
+            self._channel_data = self._fetch_channels()
             return self._channel_data
 
+    def get_current_channel_items(self, now):
+        """
+        Returns (channel, program) items for the channels with a program airing now.
+        The list is cached per minute, so re-entering Screen 2 does not rescan the channels.
+        """
+        minute = now.replace(second=0, microsecond=0)
+        cached = self._current_cache
+        if cached is not None and cached[0] == minute:
+            return cached[1]
+
+        items = []
+        now_ts = now.timestamp()
+        for channel in self.get_channels():
+            # Last program started at or before now; it's current unless already over
+            idx = bisect.bisect_right(channel['_starts'], now_ts) - 1
+            if idx >= 0 and channel['_stops'][idx] > now_ts:
+                items.append((channel, channel['programmes'][idx]))
+
+        self._current_cache = (minute, items)
+        return items
+
+    def _fetch_channels(self):
+        """
+        Downloads and parses the provider's feed. Returns an empty list on error.
+        The parsed data is kept on disk and revalidated with a conditional GET,
+        so an unchanged feed is neither downloaded nor parsed again.
+        """
+        cached = self._load_disk_cache()
+        if cached is not None and time.time() - cached[3] < self._cache_ttl:
+            logging.info(f"Using fresh disk cache for {self.url}")
+            return cached[2]
+
+        headers = {'Accept-Encoding': 'gzip'}  # Transport compression is decoded by requests
+        if cached is not None:
+            etag, last_modified, _, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
         logging.info(f"Fetching and parsing new data from {self.url}")
         try:
-            response = requests.get(self.url, timeout=20)
-            response.raise_for_status()
-
-            content = response.content
-            if self.url.endswith('.gz') or response.headers.get('Content-Type') == 'application/gzip':
-                xml_data = gzip.decompress(content)
-            else:
-                xml_data = content
-
-            self._channel_data = self._parse_xml(xml_data)
-            logging.info(f"Successfully parsed {len(self._channel_data)} channels from {self.url}")
-            return self._channel_data
-
-        except requests.RequestException as e:
-            logging.error(f"Failed to download EPG data from {self.url}: {e}")
-        except gzip.BadGzipFile as e:
+            with self._session.get(self.url, headers=headers, timeout=20, stream=True) as response:
+                if response.status_code == 304 and cached is not None:
+                    logging.info(f"EPG data not modified, using disk cache for {self.url}")
+                    self._touch_disk_cache()
+                    return cached[2]
+                response.raise_for_status()
+
+                # Decompress and parse the body as it arrives. Archives are recognized
+                # by their magic bytes, so a misleading URL or Content-Type (or a .gz
+                # already unpacked via Content-Encoding) doesn't matter.
+                response.raw.decode_content = True
+                response.raw.auto_close = False  # Let the buffered wrapper see a clean EOF
+                source = io.BufferedReader(response.raw, READ_BUFFER_SIZE)
+                if source.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+                    source = gzip.GzipFile(fileobj=source)
+
+                channel_data = self._parse_xml(source)
+
+            logging.info(f"Successfully parsed {len(channel_data)} channels from {self.url}")
+            self._save_disk_cache(response.headers.get('ETag'), response.headers.get('Last-Modified'), channel_data)
+            return channel_data
+
+        except (gzip.BadGzipFile, EOFError) as e:  # Before OSError, which BadGzipFile derives from
             logging.error(f"Failed to decompress Gzip file from {self.url}: {e}")
-        except ET.ParseError as e:
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+            # The body is read from response.raw, so a connection dropped or timed out
+            # mid-transfer surfaces as a urllib3 (or socket) error, not a requests one
+            logging.error(f"Failed to download EPG data from {self.url}: {e}")
+            if cached is not None:
+                logging.info(f"Using disk cache for {self.url}")
+                return cached[2]
+        except ET.ParseError as e:  # lxml's XMLSyntaxError derives from it
             logging.error(f"Failed to parse XML from {self.url}: {e}")
         except Exception as e:
             logging.error(f"An unexpected error occurred while processing {self.url}: {e}", exc_info=True)
 
-        self._channel_data = []  # Cache empty list on error to prevent retries
-        return self._channel_data
+        return []  # Cached by the caller to prevent retries
 
-    def _parse_xml(self, xml_data):
-        """Parses the XMLTV data string into a structured list of channels."""
-        root = ET.fromstring(xml_data)
+    def _load_disk_cache(self):
+        """Returns (etag, last_modified, channel_data, mtime) from the disk cache, or None."""
+        try:
+            # Never unpickle a file planted by another user
+            stat = self._cache_path.stat()
+            if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+                logging.warning(f"Ignoring disk cache {self._cache_path} owned by another user")
+                return None
+            with open(self._cache_path, 'rb') as f:
+                version, etag, last_modified, channel_data = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Failed to read disk cache {self._cache_path}: {e}")
+            return None
 
+        if version != CACHE_VERSION:
+            return None
+        return etag, last_modified, channel_data, stat.st_mtime
+
+    def _touch_disk_cache(self):
+        """Marks the disk cache as just revalidated, restarting its TTL."""
+        try:
+            os.utime(self._cache_path)
+        except OSError as e:
+            logging.warning(f"Failed to update disk cache {self._cache_path}: {e}")
+
+    def _save_disk_cache(self, etag, last_modified, channel_data):
+        """Atomically writes the parsed channel data together with its validators."""
+        try:
+            cache_dir = self._cache_path.parent
+            cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Loaders are daemon threads, so quitting mid-write leaves a temp file behind;
+            # remove those left by earlier runs (recent ones may belong to a running EPGi)
+            for stale_path in cache_dir.glob('*.tmp'):
+                try:
+                    if time.time() - stale_path.stat().st_mtime > STALE_TMP_AGE:
+                        stale_path.unlink()
+                except OSError:
+                    pass
+            tmp_path = cache_dir / f"{self._cache_path.name}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((CACHE_VERSION, etag, last_modified, channel_data), f, protocol=5)
+                os.replace(tmp_path, self._cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logging.warning(f"Failed to write disk cache {self._cache_path}: {e}")
+
+    def _parse_xml(self, source):
+        """
+        Parses the XMLTV data from a file-like object into a structured list of channels.
+        Elements are processed as they are closed and freed right away,
+        so only the current <channel>/<programme> stays in memory.
+        """
         channels = {}
-        for channel_elem in root.findall('channel'):
-            channel_id = channel_elem.get('id')
-            display_name_elem = channel_elem.find('display-name')
-            if channel_id and display_name_elem is not None and display_name_elem.text:
-                channels[channel_id] = {'name': display_name_elem.text, 'programmes': []}
-
-        dt_format = "%Y%m%d%H%M%S %z"
-        for prog_elem in root.findall('programme'):
-            channel_id = prog_elem.get('channel')
-            if channel_id in channels:
+        pending = {}  # Programmes that arrived before their <channel>
+        skipped = set()  # Ids of channels excluded by the channel filter
+
+        for elem in _iterparse_elements(source, ('channel', 'programme')):
+            if elem.tag == 'channel':
+                channel_id = elem.get('id')
+                display_name_elem = elem.find('display-name')
+                if channel_id and display_name_elem is not None and display_name_elem.text:
+                    name_cf = display_name_elem.text.casefold()  # Sort/filter key
+                    if self._channel_filter and not any(f in name_cf for f in self._channel_filter):
+                        skipped.add(channel_id)
+                        pending.pop(channel_id, None)
+                    else:
+                        channels[channel_id] = {'name': display_name_elem.text,
+                                                '_name_cf': name_cf,
+                                                'programmes': pending.pop(channel_id, [])}
+            else:
+                channel_id = elem.get('channel')
+                if channel_id in skipped:
+                    continue
                 try:
-                    title_elem = prog_elem.find('title')
-                    title = title_elem.text if title_elem is not None else "No Title"
-
-                    start_time = datetime.strptime(prog_elem.get('start'), dt_format)
-                    stop_time = datetime.strptime(prog_elem.get('stop'), dt_format)
-
-                    # Store all program attributes for Screen 4
-                    attributes = {**prog_elem.attrib}
-                    for child in prog_elem:
-                        if child.text and child.text.strip():
-                            tag = child.tag
-                            value = child.text.strip()
-                            if tag not in attributes:
-                                attributes[tag] = value
-                            else:
-                                if not isinstance(attributes[tag], list):
-                                    attributes[tag] = [attributes[tag]]
-                                attributes[tag].append(value)
-
-                    programme_data = {
-                        'title': title,
-                        'start': start_time,
-                        'stop': stop_time,
-                        'attributes': attributes
-                    }
-                    channels[channel_id]['programmes'].append(programme_data)
+                    title = elem.findtext('title', default="No Title")
+                    if len(title) < 64:
+                        # Series, news and reruns repeat the same titles all week;
+                        # share one string per title (also written once to the disk cache)
+                        title = sys.intern(title)
+
+                    start_time = _parse_xmltv_ts(elem.get('start'))
+                    stop_time = _parse_xmltv_ts(elem.get('stop'))
+
+                    # Only Screen 4 needs the full attribute set, and only for one program
+                    # at a time, so keep the element as serialized by libxml2 instead
+                    raw = _serialize_element(elem)
+
+                    programme_data = Programme(title, start_time, stop_time, raw)
+                    if channel_id in channels:
+                        channels[channel_id]['programmes'].append(programme_data)
+                    elif channel_id:
+                        pending.setdefault(channel_id, []).append(programme_data)
                 except (ValueError, TypeError) as e:
                     logging.warning(f"Skipping program due to parse error in {self.url}: {e}")
 
-        # Sort programs within each channel by start time
+        # Sort programs within each channel by start time. The start/stop times are
+        # also kept as parallel arrays of POSIX timestamps: lookups bisect and compare
+        # plain doubles instead of dereferencing objects and comparing aware datetimes.
         for channel in channels.values():
-            channel['programmes'].sort(key=lambda p: p['start'])
-
+            programmes = channel['programmes']
+            starts = [p.start.timestamp() for p in programmes]
+            # Argsort on the plain floats; each start is converted only once
+            order = sorted(range(len(programmes)), key=starts.__getitem__)
+            channel['programmes'] = programmes = [programmes[i] for i in order]
+            channel['_starts'] = array('d', [starts[i] for i in order])
+            channel['_stops'] = array('d', [p.stop.timestamp() for p in programmes])
+
+        # Case-insensitive order on keys computed once per channel; Timsort is
+        # already linear for the common case of a feed listed alphabetically
         channel_list = list(channels.values())
-        channel_list.sort(key=lambda c: c['name'])
+        channel_list.sort(key=itemgetter('_name_cf'))
 
         return channel_list
 
@@ -158,6 +434,25 @@ class Config:
         self.date_fmt = self.config.get('DEFAULT', 'date_fmt', fallback='%d.%m')
         self.time_fmt = self.config.get('DEFAULT', 'time_fmt', fallback='%H:%M')
 
+        # Background loading of all EPG providers at startup
+        self.prefetch = self.config.getboolean('DEFAULT', 'prefetch', fallback=False)
+
+        # Hours a downloaded EPG is reused without contacting the server. 0 = always revalidate
+        self.cache_ttl = self.config.getfloat('DEFAULT', 'cache_ttl', fallback=1)
+
+        # Channels to load: comma-separated name substrings, case-insensitive. Empty = all
+        channel_filter = self.config.get('DEFAULT', 'channel_filter', fallback='')
+        self.channel_filter = [part.strip().casefold() for part in channel_filter.split(',') if part.strip()]
+
+
+def create_session(pool_size=8):
+    """Creates an HTTP session whose connection pool is shared by all providers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
 def setup_logging():
     """Sets up logging to EPGi.log, appending messages."""
@@ -181,11 +476,64 @@ class BaseScreen:
         self.config = config
         self.app = app # A reference back to the main EPGi app instance
         self.height, self.width = stdscr.getmaxyx()
+        self._last_rows = None  # Frame drawn by the previous display() call
+        self._last_state = None  # View state of that frame, see _unchanged()
 
     def display(self):
         """Draws the screen's content. Must be implemented by subclasses."""
         raise NotImplementedError
 
+    def input_timeout(self):
+        """Milliseconds to wait for a key before redrawing anyway; -1 waits indefinitely."""
+        return -1
+
+    def _ms_to_next_minute(self):
+        """Timeout for screens whose content changes as the clock passes a minute."""
+        now = datetime.now(self.config.tz)
+        return 60000 - now.second * 1000 - now.microsecond // 1000
+
+    def invalidate(self):
+        """Forces the next frame to be drawn, e.g. after another screen covered this one."""
+        self._last_rows = None
+        self._last_state = None
+
+    def resize(self):
+        """Picks up the new terminal size after a KEY_RESIZE."""
+        self.height, self.width = self.stdscr.getmaxyx()
+        self.invalidate()
+
+    def _unchanged(self, state):
+        """
+        Returns True if the screen was last drawn for the same view state, so
+        display() can return before building any rows; otherwise records it.
+        """
+        if state == self._last_state:
+            return True
+        self._last_state = state
+        return False
+
+    def _render(self, rows):
+        """
+        Draws a frame given as a list of (y, x, text, attr) tuples; text running
+        past the right edge is cut off by curses, so callers need not slice it.
+        Nothing is sent to the terminal if the frame equals the previous one;
+        otherwise the window is erased (not cleared, which forces a full repaint)
+        and curses pushes only the changed cells in a single update.
+        """
+        if rows == self._last_rows:
+            return
+        self._last_rows = rows
+
+        self.stdscr.erase()
+        addnstr, width = self.stdscr.addnstr, self.width  # Looked up once, not per row
+        for y, x, text, attr in rows:
+            try:
+                addnstr(y, x, text, width - x, attr)
+            except curses.error:
+                pass  # Raised after writing the bottom-right cell; the text is drawn
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
     def handle_input(self, key):
         """
         Processes user input. Must be implemented by subclasses.
@@ -199,32 +547,30 @@ class Screen1(BaseScreen):
     def __init__(self, stdscr, config, app):
         super().__init__(stdscr, config, app)
         self.providers = self.config.urls
+        # The list never changes, so its rows are formatted once
+        self.lines = [f"{num:<2} {url}" for num, url in enumerate(self.providers, 1)]
         self.current_line = 0
         self.top_line = 0
 
     def display(self):
-        self.stdscr.clear()
+        if self._unchanged((self.top_line, self.current_line)):
+            return
+
         page_size = self.height
+        rows = []
 
         for i in range(page_size):
             list_index = self.top_line + i
             if list_index >= len(self.providers):
                 break
 
-            provider_num = list_index + 1
-            provider_url = self.providers[list_index]
-
             color = self.app.C_DEFAULT
             if list_index == self.current_line:
                 color = self.app.C_CURRENT
 
-            line_text = f"{provider_num:<2} {provider_url}"
-            if len(line_text) > self.width:
-                line_text = line_text[:self.width]
-
-            self.stdscr.addstr(i, 0, line_text, color)
+            rows.append((i, 0, self.lines[list_index], color))
 
-        self.stdscr.refresh()
+        self._render(rows)
 
     def handle_input(self, key):
         num_providers = len(self.providers)
@@ -259,49 +605,109 @@ class Screen1(BaseScreen):
 
 class Screen2(BaseScreen):
     """Screen 2: Displays the list of channels and their current programs."""
+    PROGRESS_BAR_WIDTH = 10
+    PERCENT_LABELS = tuple(f"{percent:>3}% " for percent in range(101))
+
     def __init__(self, stdscr, config, app, provider_num):
         super().__init__(stdscr, config, app)
         self.provider_num = provider_num
         self.provider = self.app.providers[provider_num]
+        # The EPG is loaded in the background; until then a loading line is shown
+        self._load = self.app.load_provider(provider_num)
+        self.loading = True
 
         self.all_channels = []
         self.filtered_channels = []
         self.current_line = 0
         self.top_line = 0
         self.filter_text = ""
+        self._minute = None  # Minute the current programs were taken for
+        self._layout = None  # (width, row format, progress bar strip), see _row_layout()
+        # Program -> (formatted name and title columns, start timestamp, duration in seconds);
+        # depends only on the width, so it survives filtering and is rebuilt after a resize
+        self._row_cache = {}
 
-        self._load_data()
+        if self._load.done():
+            self._load_data()
 
     def _load_data(self):
-        """Fetches and processes channel data to find current programs."""
-        raw_channels = self.provider.get_channels()
-        now = datetime.now(self.config.tz)
+        """Fetches the channels together with their current programs."""
+        self._load.result()  # Re-raises anything the loader didn't handle
+        self._update_items(datetime.now(self.config.tz))
+        self.loading = False
 
-        current_programs = []
-        for channel in raw_channels:
-            for prog in channel['programmes']:
-                if prog['start'] <= now < prog['stop']:
-                    current_programs.append({'channel': channel, 'program': prog})
-                    break # Found current program for this channel
+    def _update_items(self, now):
+        """
+        Takes the programs airing in now's minute (memoized by the provider),
+        keeping the filter and, if it is still listed, the selected channel.
+        """
+        selected = self.filtered_channels[self.current_line][0] if self.filtered_channels else None
+        offset = self.current_line - self.top_line
 
-        self.all_channels = current_programs
-        self.filtered_channels = self.all_channels
+        self._minute = now.replace(second=0, microsecond=0)
+        self.all_channels = self.provider.get_current_channel_items(now)
+        self._filter_items()
 
-    def _apply_filter(self):
+        self.current_line = 0
+        for index, (channel, _) in enumerate(self.filtered_channels):
+            if channel is selected:
+                self.current_line = index
+                break
+        self.top_line = max(0, self.current_line - offset)
+
+    def input_timeout(self):
+        if self.loading:
+            return 100  # Poll the loader
+        return self._ms_to_next_minute()  # Programs end and progress moves on
+
+    def _filter_items(self):
         """Filters the channel list based on self.filter_text."""
         if not self.filter_text:
             self.filtered_channels = self.all_channels
         else:
+            filter_text_cf = self.filter_text.casefold()
             self.filtered_channels = [
                 item for item in self.all_channels
-                if self.filter_text.lower() in item['channel']['name'].lower()
+                if filter_text_cf in item[0]['_name_cf']
             ]
+
+    def _apply_filter(self):
+        """Applies a new self.filter_text, starting again from the top of the list."""
+        self._filter_items()
         self.current_line = 0
         self.top_line = 0
 
+    def _row_layout(self):
+        """
+        Returns (name and title format, progress bar strip) for the current width.
+        Rebuilt only when the terminal is resized, not on every frame.
+        """
+        if self._layout is None or self._layout[0] != self.width:
+            # Column widths
+            c1_w, c3_w, c4_w = 20, 4, self.PROGRESS_BAR_WIDTH
+            sep_w = 3 # 3 spaces between columns
+            c2_w = max(0, self.width - c1_w - c3_w - c4_w - sep_w)
+
+            prefix_fmt = f"{{:<{c1_w}.{c1_w}}} {{:<{c2_w}.{c2_w}}} "
+            # Every bar is a window of this strip, so no per-row string building
+            bar_strip = '█' * c4_w + ' ' * c4_w
+            self._layout = (self.width, prefix_fmt, bar_strip)
+            self._row_cache = {}
+        return self._layout[1], self._layout[2]
+
     def display(self):
-        self.stdscr.clear()
+        if self.loading:
+            if not self._load.done():
+                self._render([(0, 0, f"Loading EPG from {self.provider.url}...", self.app.C_STATUS)])
+                return
+            self._load_data()
+
+        now = datetime.now(self.config.tz)  # One clock read per frame
+        if now.replace(second=0, microsecond=0) != self._minute:
+            self._update_items(now)
+
         page_size = self.height - 2  # For status bar and a potential footer
+        rows = []
 
         # --- Status Bar ---
         filter_str = f"[F]ilter: '{self.filter_text}'" if self.filter_text else "[F]ilter: None"
@@ -309,83 +715,89 @@ class Screen2(BaseScreen):
         keys_str = "(Ent=э4, →=э3, Esc/←=назад, C=clr)"
         status_line1 = f"{filter_str}  {counts_str}"
 
-        self.stdscr.addstr(0, 0, status_line1, self.app.C_STATUS)
+        rows.append((0, 0, status_line1, self.app.C_STATUS))
         # Right-align the keys help text
         if len(status_line1) + len(keys_str) < self.width:
-             self.stdscr.addstr(0, self.width - len(keys_str) -1, keys_str, self.app.C_STATUS)
+             rows.append((0, self.width - len(keys_str) -1, keys_str, self.app.C_STATUS))
 
         # --- Table Content ---
+        # Only the progress columns change over time; the rest of a row is
+        # formatted the first time it becomes visible and then reused
+        prefix_fmt, bar_strip = self._row_layout()
+        progress_bar_width = self.PROGRESS_BAR_WIDTH
+        now_ts = now.timestamp()  # Progress is plain float math, no timedelta per row
+
         for i in range(page_size):
             list_index = self.top_line + i
             if list_index >= len(self.filtered_channels):
                 break
 
-            item = self.filtered_channels[list_index]
-            channel_name = item['channel']['name']
-            program = item['program']
+            channel, program = self.filtered_channels[list_index]
+            cached = self._row_cache.get(program)
+            if cached is None:
+                start_ts = program.start.timestamp()
+                cached = (prefix_fmt.format(channel['name'], program.title),
+                          start_ts, program.stop.timestamp() - start_ts)
+                self._row_cache[program] = cached
+            prefix, start_ts, duration = cached
 
             # Calculate progress
-            now = datetime.now(self.config.tz)
-            duration = (program['stop'] - program['start']).total_seconds()
-            elapsed = (now - program['start']).total_seconds()
+            elapsed = now_ts - start_ts
             progress_percent = min(100, max(0, int((elapsed / duration) * 100))) if duration > 0 else 0
 
-            progress_bar_width = 10
             filled_blocks = int(progress_bar_width * progress_percent / 100)
-            progress_bar = '█' * filled_blocks + ' ' * (progress_bar_width - filled_blocks)
+            progress_bar = bar_strip[progress_bar_width - filled_blocks:2 * progress_bar_width - filled_blocks]
 
             color = self.app.C_DEFAULT
             if list_index == self.current_line:
                 color = self.app.C_CURRENT
 
-            # Column widths
-            c1_w, c3_w, c4_w = 20, 4, 10
-            sep_w = 3 # 3 spaces between columns
-            c2_w = self.width - c1_w - c3_w - c4_w - sep_w
+            line = prefix + self.PERCENT_LABELS[progress_percent] + progress_bar
 
-            line = f"{channel_name:<{c1_w}.{c1_w}} {program['title']:<{c2_w}.{c2_w}} {progress_percent:>3}% {progress_bar}"
-            if len(line) > self.width:
-                line = line[:self.width]
+            rows.append((i + 1, 0, line, color))
 
-            self.stdscr.addstr(i + 1, 0, line, color)
-
-        self.stdscr.refresh()
+        self._render(rows)
 
     def _get_user_input(self, prompt):
         self.stdscr.addstr(0, 0, " " * self.width, self.app.C_STATUS) # Clear status bar
         self.stdscr.addstr(0, 0, prompt, self.app.C_STATUS)
         curses.echo()
         curses.curs_set(1)
+        self.stdscr.timeout(-1)  # Don't let the refresh timeout cut the input short
         input_str = self.stdscr.getstr(0, len(prompt)).decode('utf-8')
         curses.noecho()
         curses.curs_set(0)
         return input_str
 
     def handle_input(self, key):
-        num_channels = len(self.filtered_channels)
+        last_line = max(0, len(self.filtered_channels) - 1)  # The list may be empty
         page_size = self.height - 2
 
+        if self.loading:
+            return 'BACK' if key in [curses.KEY_LEFT, 27] else None
+
         if key == curses.KEY_UP:
             self.current_line = max(0, self.current_line - 1)
         elif key == curses.KEY_DOWN:
-            self.current_line = min(num_channels - 1, self.current_line + 1)
+            self.current_line = min(last_line, self.current_line + 1)
         elif key == curses.KEY_HOME:
             self.current_line = 0
         elif key == curses.KEY_END:
-            self.current_line = num_channels - 1
+            self.current_line = last_line
         elif key == curses.KEY_PPAGE:
             self.current_line = max(0, self.current_line - page_size)
         elif key == curses.KEY_NPAGE:
-            self.current_line = min(num_channels - 1, self.current_line + page_size)
+            self.current_line = min(last_line, self.current_line + page_size)
         elif key in [ord('f'), ord('F')]:
             self.filter_text = self._get_user_input(f"[F]ilter: '{self.filter_text}' > ")
             self._apply_filter()
+            self.invalidate()  # The prompt was drawn over the status bar
         elif key in [ord('c'), ord('C')]:
             self.filter_text = ""
             self._apply_filter()
-        elif key == curses.KEY_RIGHT:
+        elif key == curses.KEY_RIGHT and self.filtered_channels:
             return Screen3(self.stdscr, self.config, self.app, self.filtered_channels[self.current_line])
-        elif key == curses.KEY_ENTER or key == 10:
+        elif (key == curses.KEY_ENTER or key == 10) and self.filtered_channels:
             return Screen4(self.stdscr, self.config, self.app, self.filtered_channels[self.current_line])
         elif key in [curses.KEY_LEFT, 27]:
             return 'BACK'
@@ -400,54 +812,81 @@ class Screen2(BaseScreen):
 
 class Screen3(BaseScreen):
     """Screen 3: Displays the program guide for a single channel."""
+    ROW_FORMAT = "{:<5} {:<5} {}"  # dd.mm HH:MM title
+
     def __init__(self, stdscr, config, app, channel_item):
         super().__init__(stdscr, config, app)
-        self.channel_data = channel_item['channel']
+        self.channel_data, current_program = channel_item
         self.programmes = self.channel_data['programmes']
 
-        current_program = channel_item['program']
-        try:
-            self.current_line = self.programmes.index(current_program)
-        except ValueError:
-            self.current_line = 0
+        # Locate the program by its start time (same lookup as Screen 2) instead of
+        # scanning the list; fall back to a scan only if programs share a start time
+        idx = bisect.bisect_right(self.channel_data['_starts'], current_program.start.timestamp()) - 1
+        if idx >= 0 and self.programmes[idx] is current_program:
+            self.current_line = idx
+        else:
+            try:
+                self.current_line = self.programmes.index(current_program)
+            except ValueError:
+                self.current_line = 0
 
         # Set initial viewport to show previous, current, and next programs
         self.top_line = max(0, self.current_line - 1)
 
-    def display(self):
-        self.stdscr.clear()
-        page_size = self.height
-        now = datetime.now(self.config.tz)
-
-        for i in range(page_size):
-            list_index = self.top_line + i
-            if list_index >= len(self.programmes):
-                break
-
-            program = self.programmes[list_index]
-            start_time = program['start'].astimezone(self.config.tz)
-            stop_time = program['stop'].astimezone(self.config.tz)
-
-            if stop_time < now:
-                color = self.app.C_PAST
-            elif list_index == self.current_line:
-                color = self.app.C_CURRENT
-            else:
-                color = self.app.C_DEFAULT
-
-            date_str = start_time.strftime(self.config.date_fmt)
-            time_str = start_time.strftime(self.config.time_fmt)
-            title_str = program['title']
+        # The whole guide is drawn into an off-screen pad; scrolling only moves the viewport
+        self._pad = None
+        self._pad_key = None  # (width, height, minute) the pad was drawn for
+        self._pad_line = None  # Row drawn highlighted in the pad
+
+    def input_timeout(self):
+        return self._ms_to_next_minute()  # Gray out programs as they end
+
+    def _draw_row(self, index, now):
+        """Draws a single program into the pad."""
+        program = self.programmes[index]
+        if program._line is None:
+            date_str, time_str = _format_start(self.channel_data['_starts'][index], self.config.tz,
+                                               self.config.date_fmt, self.config.time_fmt)
+            program._line = self.ROW_FORMAT.format(date_str, time_str, program.title)
+
+        if program.stop < now:
+            color = self.app.C_PAST
+        elif index == self.current_line:
+            color = self.app.C_CURRENT
+        else:
+            color = self.app.C_DEFAULT
 
-            c1_w, c2_w = 5, 5 # dd.mm, HH:MM
-            sep = " "
-            line = f"{date_str:<{c1_w}}{sep}{time_str:<{c2_w}}{sep}{title_str}"
-            if len(line) > self.width:
-                line = line[:self.width]
+        try:
+            self._pad.addnstr(index, 0, program._line, self.width, color)
+        except curses.error:
+            pass  # Raised after writing the bottom-right cell; the text is drawn
 
-            self.stdscr.addstr(i, 0, line, color)
+    def display(self):
+        now = datetime.now(self.config.tz)
+        pad_key = (self.width, self.height, now.replace(second=0, microsecond=0))
+        if pad_key != self._pad_key:
+            # Redrawn on entry, after a resize, and once a minute as programs end. A full
+            # screen of blank rows follows the last program, so the viewport always lies
+            # inside the pad and covers whatever the previous screen left behind
+            self._pad = curses.newpad(len(self.programmes) + self.height, self.width)
+            for index in range(len(self.programmes)):
+                self._draw_row(index, now)
+            self._pad_key = pad_key
+            self._pad_line = self.current_line
+        elif self._pad_line != self.current_line:
+            # Only the previously and newly selected rows change color
+            previous_line, self._pad_line = self._pad_line, self.current_line
+            self._draw_row(previous_line, now)
+            self._draw_row(self.current_line, now)
+
+        if self._unchanged((self.top_line, self.current_line, pad_key)):
+            return
 
-        self.stdscr.refresh()
+        # Flush pending changes to stdscr (e.g. the clear() after a resize) first;
+        # otherwise getch() would refresh stdscr and wipe the pad from the screen
+        self.stdscr.noutrefresh()
+        self._pad.noutrefresh(self.top_line, 0, 0, 0, self.height - 1, self.width - 1)
+        curses.doupdate()
 
     def handle_input(self, key):
         num_programmes = len(self.programmes)
@@ -467,8 +906,7 @@ class Screen3(BaseScreen):
             self.current_line = min(num_programmes - 1, self.current_line + page_size)
         elif key in [curses.KEY_RIGHT, curses.KEY_ENTER, 10]:
             selected_program = self.programmes[self.current_line]
-            new_item = {'channel': self.channel_data, 'program': selected_program}
-            return Screen4(self.stdscr, self.config, self.app, new_item)
+            return Screen4(self.stdscr, self.config, self.app, (self.channel_data, selected_program))
         elif key in [curses.KEY_LEFT, 27]:
             return 'BACK'
 
@@ -480,60 +918,73 @@ class Screen3(BaseScreen):
 
         return None
 
-import textwrap
+# Shared by all Screen4 instances; only the width and indents change per attribute
+_WRAPPER = textwrap.TextWrapper(break_long_words=True, break_on_hyphens=True)
+
 
 class Screen4(BaseScreen):
     """Screen 4: Displays all attributes for a program."""
     def __init__(self, stdscr, config, app, channel_item):
         super().__init__(stdscr, config, app)
-        self.program = channel_item['program']
-        self.attributes = self.program.get('attributes', {})
+        _, self.program = channel_item
         self.lines = []
         self.top_line = 0
         self._prepare_lines()
 
     def _prepare_lines(self):
-        """Converts the attributes dict into a list of wrapped lines for display."""
+        """
+        Converts the attributes dict into a list of wrapped lines for display.
+        The lines are cached on the program per screen width, so reopening it is instant.
+        """
+        if self.program._wrapped is None:
+            self.program._wrapped = {}
+        wrapped_cache = self.program._wrapped
+        if self.width in wrapped_cache:
+            self.lines = wrapped_cache[self.width]
+            return
+
         self.lines = []
-        if not self.attributes:
+        wrapped_cache[self.width] = self.lines
+        attributes = self.program.attributes  # Decoded from the raw element only on a cache miss
+        if not attributes:
             self.lines.append("No attributes found for this program.")
             return
 
         wrap_width = self.width - 2 if self.width > 4 else self.width
+        _WRAPPER.width = wrap_width
 
-        for key, value in sorted(self.attributes.items()):
+        for key, value in sorted(attributes.items()):
             if isinstance(value, list):
                 value_str = ", ".join(value)
             else:
                 value_str = str(value)
 
-            first_line_prefix = f"{key}: "
-            subsequent_indent = " " * (len(key) + 2)
-
-            wrapper = textwrap.TextWrapper(
-                width=wrap_width,
-                initial_indent=first_line_prefix,
-                subsequent_indent=subsequent_indent,
-                break_long_words=True,
-                break_on_hyphens=True
-            )
+            _WRAPPER.initial_indent = f"{key}: "
+            _WRAPPER.subsequent_indent = " " * (len(key) + 2)
 
-            wrapped_lines = wrapper.wrap(value_str)
+            wrapped_lines = _WRAPPER.wrap(value_str)
             self.lines.extend(wrapped_lines)
             self.lines.append("") # Blank line for readability
 
+    def resize(self):
+        super().resize()
+        self._prepare_lines()  # Rewrap for the new width
+
     def display(self):
-        self.stdscr.clear()
+        if self._unchanged(self.top_line):
+            return
+
         page_size = self.height
+        rows = []
 
         for i in range(page_size):
             line_idx = self.top_line + i
             if line_idx >= len(self.lines):
                 break
 
-            self.stdscr.addstr(i, 1, self.lines[line_idx], self.app.C_DEFAULT)
+            rows.append((i, 1, self.lines[line_idx], self.app.C_DEFAULT))
 
-        self.stdscr.refresh()
+        self._render(rows)
 
     def handle_input(self, key):
         num_lines = len(self.lines)
@@ -555,18 +1006,70 @@ class Screen4(BaseScreen):
         return None
 
 
+class BackgroundLoad:
+    """
+    Runs a function on a daemon thread and holds its result. A daemon thread, unlike
+    an executor worker, is not joined at exit, so quitting never waits for a download
+    the user has walked away from (concurrent.futures.Future is meant to be resolved
+    by an executor only, hence this small holder).
+    """
+    def __init__(self, func, name):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        threading.Thread(target=self._run, args=(func,), name=name, daemon=True).start()
+
+    def _run(self, func):
+        try:
+            self._result = func()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def done(self):
+        """Returns True once the function has returned or raised."""
+        return self._done.is_set()
+
+    def result(self):
+        """Waits for the function and returns its result, re-raising its exception."""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
 class EPGi:
     """Main application class."""
     def __init__(self, stdscr, config):
         self.stdscr = stdscr
         self.config = config
-        self.providers = {i: EPGProvider(url) for i, url in enumerate(config.urls, 1)}
+        self.session = create_session()
+        self.providers = {i: EPGProvider(url, self.session, config.channel_filter, config.cache_ttl * 3600)
+                          for i, url in enumerate(config.urls, 1)}
+        self._loads = {}  # Provider number -> BackgroundLoad of its get_channels()
 
         self._init_curses()
 
         # Start with Screen 1 on the stack
         self.screen_stack = [Screen1(self.stdscr, self.config, self)]
 
+        if self.config.prefetch:
+            self._prefetch_all()
+
+    def _prefetch_all(self):
+        """Loads every provider's EPG in background threads (the downloads are I/O-bound)."""
+        for provider_num in self.providers:
+            self.load_provider(provider_num)
+
+    def load_provider(self, provider_num):
+        """Starts loading a provider's EPG in the background, once; returns its BackgroundLoad."""
+        load = self._loads.get(provider_num)
+        if load is None:
+            load = BackgroundLoad(self.providers[provider_num].get_channels, f'EPGi-loader-{provider_num}')
+            self._loads[provider_num] = load
+        return load
+
     def _init_curses(self):
         """Initializes curses settings and color pairs."""
         curses.curs_set(0)
@@ -595,7 +1098,15 @@ class EPGi:
             current_screen = self.screen_stack[-1]
             current_screen.display()
 
+            self.stdscr.timeout(current_screen.input_timeout())
             key = self.stdscr.getch()
+            if key == -1:
+                continue  # Timed out; redraw
+            if key == curses.KEY_RESIZE:
+                self.stdscr.clear()  # The terminal contents are unknown after a resize
+                for screen in self.screen_stack:
+                    screen.resize()
+                continue
 
             action = current_screen.handle_input(key)
 
@@ -604,6 +1115,7 @@ class EPGi:
             elif action == 'BACK':
                 if len(self.screen_stack) > 1:
                     self.screen_stack.pop()
+                    self.screen_stack[-1].invalidate()
             elif isinstance(action, BaseScreen):
                 self.screen_stack.append(action)
 
@@ -632,9 +1144,9 @@ def main(stdscr):
 
 
 if __name__ == '__main__':
-    import sys
-
     setup_logging()
+    if not USING_LXML:
+        logging.warning("lxml is not installed; falling back to the slower xml.etree parser.")
 
     # A simple CLI flag to test config loading without starting curses
     if '--test-config' in sys.argv:
@@ -664,7 +1176,7 @@ if __name__ == '__main__':
             else:
                 url_to_test = config.urls[0]
                 print(f"Testing fetch from first URL: {url_to_test}")
-                provider = EPGProvider(url_to_test)
+                provider = EPGProvider(url_to_test, channel_filter=config.channel_filter)
 
                 print("\n--- First call to get_channels() ---")
                 channels = provider.get_channels()
@@ -675,7 +1187,7 @@ if __name__ == '__main__':
                     print(f"  Sample channel: {first_channel['name']}")
                     if first_channel['programmes']:
                         first_prog = first_channel['programmes'][0]
-                        print(f"    Sample program: '{first_prog['title']}' starting at {first_prog['start']}")
+                        print(f"    Sample program: '{first_prog.title}' starting at {first_prog.start}")
                 else:
                     print("Fetch test completed, but no channels were parsed. Check EPGi.log for errors.")
 